@@ -11,23 +11,34 @@
 #  - One-line output (comma-separated)
 #  - Skips lines starting with ###, //, #
 #  - Safe write via temp file then atomic replace
+#  - Parsed older files are cached in <folder>/.watchlist_cache.json
 # =============================================
 
 from pathlib import Path
 import sys
 import re
-import argparse
+import fnmatch
+import stat
 import tempfile
 import os
 from datetime import datetime
+from itertools import chain, filterfalse
+from operator import itemgetter
+from types import SimpleNamespace
 
 BANNER = "Watchlist Filter • v1.4"
+CACHE_NAME = ".watchlist_cache.json"
+# Bump whenever parsing rules change, so cached symbol lists are re-parsed.
+CACHE_VERSION = 1
+
+_BLOCK_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPLIT_RE = re.compile(r"[,\n\r]+")
 
 # -------------- Parsing utilities --------------
 
 def strip_block_comments(text: str) -> str:
     """Remove /* ... */ blocks."""
-    return re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    return _BLOCK_RE.sub("", text)
 
 def split_symbols(text: str):
     """
@@ -37,64 +48,162 @@ def split_symbols(text: str):
     - Drop empty entries and comment lines (###, //, #).
     """
     text = strip_block_comments(text)
-    parts = re.split(r"[,\n\r]+", text)
     clean = []
-    for p in parts:
+    append = clean.append
+    for p in _SPLIT_RE.split(text):
         s = p.strip()
-        if not s:
-            continue
-        if s.startswith("###") or s.startswith("//") or s.startswith("#"):
+        # '#' also covers '###'
+        if not s or s[0] == "#" or s[:2] == "//":
             continue
-        clean.append(s)
+        append(s)
     return clean
 
 def read_symbols_from_file(path: Path):
     """Read file and return parsed symbol list. Warn if reading fails."""
     try:
-        txt = path.read_text(encoding="utf-8", errors="ignore")
+        # One bytes read + one C-level decode; no text-mode reader layer.
+        txt = path.read_bytes().decode("utf-8", "ignore")
     except Exception as e:
         print(f"[WARN] Failed to read {path.name}: {e}", file=sys.stderr)
         return []
     return split_symbols(txt)
 
-def is_watchlist_file(p: Path):
-    """Accept .csv or .txt files."""
-    return p.is_file() and p.suffix.lower() in (".csv", ".txt")
+def is_watchlist_entry(entry: os.DirEntry) -> bool:
+    """
+    Accept .csv or .txt files. The name is checked first (no syscall); is_file()
+    then uses the dirent type from scandir and only stats for symlinks.
+    """
+    return entry.name.lower().endswith((".csv", ".txt")) and entry.is_file()
+
+def _iter_candidates(folder: Path, pattern: str | None):
+    """
+    Yield (path, stat) for watchlist files in 'folder', stat'ing each once.
+    Patterns with a directory part ('sub/*.csv', '**/*.csv') go through
+    Path.glob; plain name patterns are matched against a single scandir pass.
+    """
+    if pattern and ("/" in pattern or os.sep in pattern or "**" in pattern):
+        for p in folder.glob(pattern):
+            if p.suffix.lower() not in (".csv", ".txt"):
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue  # dangling symlink, symlink loop, vanished file
+            if stat.S_ISREG(st.st_mode):
+                yield p, st
+        return
+    # Match names the same way Path.glob does (case-insensitive on Windows).
+    name_re = re.compile(fnmatch.translate(os.path.normcase(pattern))) if pattern else None
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not is_watchlist_entry(entry):
+                continue
+            if name_re is not None and not name_re.match(os.path.normcase(entry.name)):
+                continue
+            yield Path(entry.path), entry.stat()
 
-def list_watchlist_files(folder: Path, pattern: str | None, days: int | None):
+def list_watchlist_entries(folder: Path, pattern: str | None, days: int | None):
     """
-    Return files sorted by mtime (newest first).
-    - pattern: optional glob (e.g., 'ADR_*.*')
+    Return (path, stat) pairs sorted by mtime (newest first).
+    - pattern: optional glob (e.g., 'ADR_*.*' or 'sub/*.csv')
     - days: only files modified within last N days
+    Each file is stat'ed once; the stat is reused for the age check, the sort
+    and by callers (cache validation, the "modified" timestamp).
     """
-    files = []
-    candidates = folder.glob(pattern) if pattern else folder.iterdir()
+    entries: list[tuple[float, Path, os.stat_result]] = []
     now = datetime.now()
-    for p in candidates:
-        if not is_watchlist_file(p):
-            continue
+    for p, st in _iter_candidates(folder, pattern):
+        mt = st.st_mtime
         if days is not None:
-            age_days = (now - datetime.fromtimestamp(p.stat().st_mtime)).days
+            age_days = (now - datetime.fromtimestamp(mt)).days
             if age_days > days:
                 continue
-        files.append(p)
-    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return files
+        entries.append((mt, p, st))
+    # Sort on the cached mtime only: no Path comparisons on ties, and
+    # equal mtimes keep directory order (stable sort).
+    entries.sort(key=itemgetter(0), reverse=True)
+    return [(p, st) for _, p, st in entries]
 
 # -------------- Core ops --------------
 
-def build_seen_symbols(files: list[Path]) -> set[str]:
-    """Aggregate symbols from older files into a set for O(1) lookup."""
+def _load_cache(folder: Path) -> dict:
+    """
+    Load the per-folder symbol cache: {relative path: (mtime_ns, size, joined)}.
+    'joined' is the file's symbols as one comma-joined str (a symbol can never
+    contain a comma); one str per file keeps the loaded cache small.
+    A missing, unreadable or other-version cache is treated as empty.
+    """
+    import json  # deferred: only needed when older files are compared
+    path = folder / CACHE_NAME
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if raw.get("version") != CACHE_VERSION:
+            return {}
+        return {key: (mt, size, syms) for key, (mt, size, syms) in raw["files"].items()}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[WARN] Ignoring unreadable cache {path.name}: {e}", file=sys.stderr)
+        return {}
+
+def _save_cache(folder: Path, cache: dict) -> None:
+    """Write the symbol cache safely (temp -> replace). Failure only warns."""
+    import json
+    raw = {
+        "version": CACHE_VERSION,
+        "files": {key: [mt, size, syms] for key, (mt, size, syms) in cache.items()},
+    }
+    try:
+        with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8", dir=str(folder)) as tf:
+            json.dump(raw, tf)
+            tmp_name = tf.name
+        os.replace(tmp_name, folder / CACHE_NAME)
+    except Exception as e:
+        print(f"[WARN] Failed to write cache {CACHE_NAME}: {e}", file=sys.stderr)
+
+def build_seen_symbols(files: list[Path], folder: Path | None = None,
+                       stats: list[os.stat_result] | None = None) -> set[str]:
+    """
+    Aggregate symbols from older files into a set for O(1) lookup.
+    Files whose (mtime, size) match the cache in 'folder' (default: the first
+    file's folder) are not re-parsed. Cache keys are paths relative to 'folder'.
+    'stats' (parallel to 'files') avoids re-stat'ing files just listed.
+    """
     seen: set[str] = set()
-    for f in files:
+    if not files:
+        return seen
+    if folder is None:
+        folder = files[0].parent
+    if stats is None:
+        stats = [f.stat() for f in files]
+    cache = _load_cache(folder)
+    # Drop entries for files that are gone (e.g. deleted newest sources).
+    # --pattern/--days only narrow the listing, so check existence directly.
+    stale = [key for key in cache if not (folder / key).is_file()]
+    for key in stale:
+        del cache[key]
+    dirty = bool(stale)
+    for f, st in zip(files, stats):
+        key = f.relative_to(folder).as_posix()
+        hit = cache.get(key)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            # The split list is temporary: only 'seen' keeps the symbols.
+            seen.update(hit[2].split(","))
+            continue
         syms = read_symbols_from_file(f)
+        # Empty results are not cached: they may come from a failed read.
         if syms:
-            seen |= set(syms)
+            cache[key] = (st.st_mtime_ns, st.st_size, ",".join(syms))
+            dirty = True
+        seen.update(syms)
+    if dirty:
+        _save_cache(folder, cache)
     return seen
 
 def filter_symbols(latest_syms: list[str], seen: set[str]) -> list[str]:
     """Filter out any symbol present in 'seen', preserving order."""
-    return [s for s in latest_syms if s not in seen]
+    # filterfalse drives the bound membership test from C, no per-item bytecode.
+    return list(filterfalse(seen.__contains__, latest_syms))
 
 def combine_files_unique(files: list[Path]) -> list[str]:
     """
@@ -102,23 +211,17 @@ def combine_files_unique(files: list[Path]) -> list[str]:
     Order rule: first-seen wins by scanning files from OLDEST -> NEWEST,
     preserving symbol order inside each file.
     """
-    ordered_unique: list[str] = []
-    seen: set[str] = set()
-    # files are passed as NEWEST->OLDEST; we want OLDEST first:
-    for f in reversed(files):
-        for s in read_symbols_from_file(f):
-            if s not in seen:
-                seen.add(s)
-                ordered_unique.append(s)
-    return ordered_unique
+    # files are passed as NEWEST->OLDEST; we want OLDEST first.
+    # dict keeps insertion order, so fromkeys dedupes with first-seen winning.
+    return list(dict.fromkeys(chain.from_iterable(read_symbols_from_file(f) for f in reversed(files))))
 
 # -------------- Safe write helpers (always .txt) --------------
 
 def write_one_line_txt(out_path: Path, symbols: list[str]) -> Path:
     """Write one-line, comma-separated .txt safely (temp -> replace)."""
-    one_line = ",".join(symbols)
-    with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8", dir=str(out_path.parent)) as tf:
-        tf.write(one_line)
+    # Binary mode: no TextIOWrapper codec/newline layer, one write call.
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(out_path.parent)) as tf:
+        tf.write(",".join(symbols).encode("utf-8"))
         tmp_name = tf.name
     os.replace(tmp_name, out_path)
     return out_path
@@ -135,15 +238,84 @@ def safe_write_combined_txt(base: Path, symbols: list[str]) -> Path:
 
 # -------------- CLI --------------
 
+USAGE = "usage: filter_latest_watchlist.py [-h] [--pattern PATTERN] [--days DAYS] [--no-print] [--keep-latest] [--combine] [folder]"
+# Keep in sync with parse_args below.
+HELP = f"""{USAGE}
+
+Filter newest watchlist or combine all into a unique list.
+
+positional arguments:
+  folder             Folder containing .csv/.txt watchlists (default: current).
+
+options:
+  -h, --help         Show this help message and exit.
+  --pattern PATTERN  Glob pattern to pre-filter files (e.g. 'ADR_*.*').
+  --days DAYS        Only consider files modified within last N days.
+  --no-print         Do not print the one-line import string.
+  --keep-latest      Do not delete the newest file after filtering.
+  --combine          Combine ALL files into a unique union -> <newest_stem>_combined.txt (no deletion).
+"""
+
+_VALUE_OPTS = {"--pattern", "--days"}
+_FLAG_OPTS = {"--no-print", "--keep-latest", "--combine"}
+
+def _usage_error(msg: str):
+    """Print usage plus an error and exit with status 2 (argparse convention)."""
+    print(f"{USAGE}\nfilter_latest_watchlist.py: error: {msg}", file=sys.stderr)
+    sys.exit(2)
+
+def parse_args(argv: list[str] | None = None) -> SimpleNamespace:
+    """
+    Parse CLI arguments by hand (avoids importing and building argparse).
+    Accepts '--opt value' and '--opt=value'; '--' ends option parsing.
+    Options must be spelled out in full (no prefix abbreviations).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = SimpleNamespace(folder=None, pattern=None, days=None, no_print=False, keep_latest=False, combine=False)
+    only_positional = False
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if only_positional or not arg.startswith("-") or arg == "-":
+            if args.folder is not None:
+                _usage_error(f"unrecognized arguments: {arg}")
+            args.folder = arg
+            continue
+        if arg == "--":
+            only_positional = True
+            continue
+        if arg in ("-h", "--help"):
+            print(HELP, end="")
+            sys.exit(0)
+        name, eq, value = arg.partition("=")
+        if name in _FLAG_OPTS:
+            if eq:
+                _usage_error(f"argument {name}: ignored explicit argument '{value}'")
+            setattr(args, name[2:].replace("-", "_"), True)
+        elif name in _VALUE_OPTS:
+            if not eq:
+                # Like argparse, don't swallow the next option as a value;
+                # '--opt=--value' still works for values starting with '--'.
+                if i >= len(argv) or argv[i].startswith("--"):
+                    _usage_error(f"argument {name}: expected one argument")
+                value = argv[i]
+                i += 1
+            if name == "--days":
+                try:
+                    args.days = int(value)
+                except ValueError:
+                    _usage_error(f"argument --days: invalid int value: '{value}'")
+            else:
+                args.pattern = value
+        else:
+            _usage_error(f"unrecognized arguments: {arg}")
+    if args.folder is None:
+        args.folder = "."
+    return args
+
 def main():
-    ap = argparse.ArgumentParser(description="Filter newest watchlist or combine all into a unique list.")
-    ap.add_argument("folder", nargs="?", default=".", help="Folder containing .csv/.txt watchlists (default: current).")
-    ap.add_argument("--pattern", help="Glob pattern to pre-filter files (e.g. 'ADR_*.*').")
-    ap.add_argument("--days", type=int, help="Only consider files modified within last N days.")
-    ap.add_argument("--no-print", action="store_true", help="Do not print the one-line import string.")
-    ap.add_argument("--keep-latest", action="store_true", help="Do not delete the newest file after filtering.")
-    ap.add_argument("--combine", action="store_true", help="Combine ALL files into a unique union -> <newest_stem>_combined.txt (no deletion).")
-    args = ap.parse_args()
+    args = parse_args()
 
     base = Path(args.folder).expanduser().resolve()
     print(f"{BANNER}\nFolder: {base}")
@@ -151,14 +323,16 @@ def main():
         print("Error: folder does not exist.", file=sys.stderr)
         sys.exit(1)
 
-    files = list_watchlist_files(base, args.pattern, args.days)
-    if not files:
+    entries = list_watchlist_entries(base, args.pattern, args.days)
+    if not entries:
         print("No matching .csv/.txt files found.", file=sys.stderr)
         sys.exit(0)
 
+    files = [p for p, _ in entries]
+    stats = [st for _, st in entries]
     newest = files[0]
     others = files[1:]
-    ts = datetime.fromtimestamp(newest.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+    ts = datetime.fromtimestamp(stats[0].st_mtime).strftime("%Y-%m-%d %H:%M:%S")
     print(f"Newest file: {newest.name} (modified {ts})")
 
     # ---- COMBINE MODE ----
@@ -193,8 +367,12 @@ def main():
                 print(f"[WARN] Failed to delete {newest.name}: {e}", file=sys.stderr)
         return
 
-    seen = build_seen_symbols(others)
-    filtered = filter_symbols(newest_syms, seen)
+    if not newest_syms:
+        # Nothing to filter: don't parse the older files at all.
+        filtered = []
+    else:
+        seen = build_seen_symbols(others, base, stats[1:])
+        filtered = filter_symbols(newest_syms, seen) if seen else newest_syms
 
     removed = len(newest_syms) - len(filtered)
     print(f"Original: {len(newest_syms)} • Removed (in older files): {removed} • Remaining: {len(filtered)}")
@@ -0,0 +1,22 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+@pytest.fixture
+def flw(monkeypatch):
+    """The filter_latest_watchlist module, imported from the repo root."""
+    monkeypatch.syspath_prepend(str(REPO_ROOT))
+    import filter_latest_watchlist
+    return filter_latest_watchlist
+
+@pytest.fixture
+def run_main(monkeypatch, flw):
+    """Return a callable that runs main() in-process with the given CLI arguments."""
+    def _run(*args: str):
+        monkeypatch.setattr(sys, "argv", ["filter_latest_watchlist.py", *args])
+        flw.main()
+    return _run
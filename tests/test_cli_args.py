@@ -0,0 +1,38 @@
+# tests/test_cli_args.py
+import pytest
+
+def test_parse_args_accepts_both_option_forms_and_rejects_bad_input(flw):
+    """
+    The hand-rolled parser must accept '--opt value' and '--opt=value' with
+    the folder in any position, default folder to '.', and exit with status 2
+    on unknown options, a non-integer --days or a missing value (like argparse did).
+    """
+    args = flw.parse_args(["--pattern", "ADR_*.*", "data/2025-08", "--days=7", "--combine", "--no-print"])
+    assert args.folder == "data/2025-08"
+    assert args.pattern == "ADR_*.*"
+    assert args.days == 7
+    assert args.combine and args.no_print and not args.keep_latest
+
+    defaults = flw.parse_args([])
+    assert defaults.folder == "."
+    assert defaults.pattern is None and defaults.days is None
+
+    for bad in (["--bogus"], ["--comb"], ["--days", "x"], ["--pattern"], ["--pattern", "--combine"], ["a", "b"]):
+        with pytest.raises(SystemExit) as exc:
+            flw.parse_args(bad)
+        assert exc.value.code == 2, f"Expected usage error for {bad}"
+
+    assert flw.parse_args(["--pattern=--odd*"]).pattern == "--odd*"
+
+def test_parse_args_help_and_double_dash(flw, capsys):
+    """--help prints usage and exits 0; '--' makes the next argument positional."""
+    with pytest.raises(SystemExit) as exc:
+        flw.parse_args(["--help"])
+    assert exc.value.code == 0
+    out = capsys.readouterr().out
+    assert out.startswith("usage: filter_latest_watchlist.py")
+    assert "--keep-latest" in out
+
+    args = flw.parse_args(["--no-print", "--", "--combine"])
+    assert args.folder == "--combine"
+    assert args.no_print and not args.combine
@@ -1,7 +1,5 @@
 # tests/test_combine_mode.py
 import os
-import sys
-import subprocess
 from pathlib import Path
 import time
 
@@ -9,7 +7,7 @@ def write(p: Path, content: str):
     """Helper to write text content."""
     p.write_text(content, encoding="utf-8")
 
-def test_combine_mode_creates_union_once_preserving_first_seen_order(tmp_path: Path):
+def test_combine_mode_creates_union_once_preserving_first_seen_order(tmp_path: Path, run_main, capsys):
     """
     Setup (note mixed .csv/.txt extensions):
       - older1.csv : AAPL,MSFT,GOOG
@@ -24,10 +22,6 @@ def test_combine_mode_creates_union_once_preserving_first_seen_order(tmp_path: P
       - Source files are NOT deleted in --combine mode
       - Stdout contains ONE-LINE IMPORT STRING (COMBINED) with same content
     """
-    repo_root = Path(__file__).resolve().parents[1]
-    script = repo_root / "filter_latest_watchlist.py"
-    assert script.exists(), f"Script not found at: {script}"
-
     # Create files
     older1 = tmp_path / "older1.csv"
     mid    = tmp_path / "mid.txt"
@@ -44,12 +38,7 @@ def test_combine_mode_creates_union_once_preserving_first_seen_order(tmp_path: P
     os.utime(newest, (now - 100, now - 100))  # newest
 
     # Run in combine mode
-    result = subprocess.run(
-        [sys.executable, str(script), str(tmp_path), "--combine"],
-        capture_output=True,
-        text=True,
-        check=True
-    )
+    run_main(str(tmp_path), "--combine")
 
     # Expected
     expected = "NASDAQ:AAPL,NASDAQ:MSFT,NASDAQ:GOOG,NASDAQ:TSLA,NASDAQ:NVDA,NASDAQ:META,NASDAQ:AMZN"
@@ -61,7 +50,7 @@ def test_combine_mode_creates_union_once_preserving_first_seen_order(tmp_path: P
     assert content == expected, f"Unexpected combined content:\n{content}"
 
     # Stdout should include the combined one-liner
-    stdout = result.stdout
+    stdout = capsys.readouterr().out
     assert "ONE-LINE IMPORT STRING (COMBINED)" in stdout
     assert expected in stdout
 
@@ -1,14 +1,15 @@
+import json
 import os
-import sys
-import subprocess
 from pathlib import Path
 import time
 
+import pytest
+
 def write(p: Path, content: str):
     """Helper function to write text content to a file."""
     p.write_text(content, encoding="utf-8")
 
-def test_filters_newest_against_older_files(tmp_path: Path):
+def test_filters_newest_against_older_files(tmp_path: Path, run_main, capsys):
     """
     Setup:
       - older1.txt  (symbols: NASDAQ:AAPL,NASDAQ:MSFT,NASDAQ:NVDA)
@@ -21,10 +22,6 @@ def test_filters_newest_against_older_files(tmp_path: Path):
       - stdout contains ONE-LINE IMPORT STRING with same content.
       - newest.csv is deleted after processing (default behavior in v1.3+).
     """
-    repo_root = Path(__file__).resolve().parents[1]
-    script = repo_root / "filter_latest_watchlist.py"
-    assert script.exists(), f"Script not found at: {script}"
-
     # Create three files in tmp dir
     older1 = tmp_path / "older1.txt"
     older2 = tmp_path / "older2.csv"
@@ -41,12 +38,7 @@ def test_filters_newest_against_older_files(tmp_path: Path):
     os.utime(newest, (now - 100, now - 100))  # ~1.5 min ago (newest)
 
     # Run the script against tmp_path
-    result = subprocess.run(
-        [sys.executable, str(script), str(tmp_path)],
-        capture_output=True,
-        text=True,
-        check=True
-    )
+    run_main(str(tmp_path))
 
     # Check output file
     out_file = tmp_path / "newest_filtered.txt"
@@ -55,9 +47,161 @@ def test_filters_newest_against_older_files(tmp_path: Path):
     assert content == "NASDAQ:GOOGL,NASDAQ:META", f"Unexpected filtered content: {content}"
 
     # Check stdout one-line print
-    stdout = result.stdout
+    stdout = capsys.readouterr().out
     assert "ONE-LINE IMPORT STRING" in stdout
     assert "NASDAQ:GOOGL,NASDAQ:META" in stdout
 
     # Check that newest file was deleted
     assert not newest.exists(), "Newest source file should be deleted by default"
+
+def test_pattern_limits_candidate_files(tmp_path: Path, run_main):
+    """
+    Files not matching --pattern are ignored entirely: they are neither
+    picked as newest nor used as older files for filtering.
+    """
+    older = tmp_path / "ADR_older.csv"
+    other = tmp_path / "OTHER_list.csv"
+    newest = tmp_path / "ADR_newest.txt"
+
+    write(older, "NASDAQ:AAPL")
+    write(other, "NASDAQ:MSFT")
+    write(newest, "NASDAQ:AAPL,NASDAQ:MSFT,NASDAQ:META")
+
+    now = time.time()
+    os.utime(older, (now - 300, now - 300))
+    os.utime(newest, (now - 200, now - 200))
+    os.utime(other, (now - 100, now - 100))  # newest overall, but excluded by pattern
+
+    run_main(str(tmp_path), "--pattern", "ADR_*.*", "--no-print")
+
+    out_file = tmp_path / "ADR_newest_filtered.txt"
+    assert out_file.exists(), "Filtered output file not created."
+    assert out_file.read_text(encoding="utf-8") == "NASDAQ:MSFT,NASDAQ:META"
+    assert other.exists(), "Non-matching file must not be touched"
+
+def test_pattern_with_subfolder_part(tmp_path: Path, run_main):
+    """
+    A --pattern with a directory part ('sub/*.csv') is resolved like
+    Path.glob: files inside the subfolder are found and filtered.
+    """
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    older = sub / "old.csv"
+    newest = sub / "new.csv"
+    write(older, "NASDAQ:AAPL")
+    write(newest, "NASDAQ:AAPL,NASDAQ:META")
+    write(tmp_path / "top.csv", "NASDAQ:META")  # not matched by the pattern
+
+    now = time.time()
+    os.utime(older, (now - 300, now - 300))
+    os.utime(newest, (now - 100, now - 100))
+
+    run_main(str(tmp_path), "--pattern", "sub/*.csv", "--no-print")
+
+    out_file = sub / "new_filtered.txt"
+    assert out_file.exists(), "Filtered output file not created in the subfolder."
+    assert out_file.read_text(encoding="utf-8") == "NASDAQ:META"
+    cache = json.loads((tmp_path / ".watchlist_cache.json").read_text(encoding="utf-8"))
+    assert list(cache["files"]) == ["sub/old.csv"], "Cache must key on the path relative to the folder"
+
+def test_dangling_symlink_is_skipped(tmp_path: Path, run_main):
+    """
+    A dangling .csv symlink is skipped (not a crash), both for plain name
+    patterns (scandir) and for patterns with a directory part (Path.glob).
+    """
+    try:
+        os.symlink(tmp_path / "missing.csv", tmp_path / "broken.csv")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not supported here")
+
+    older = tmp_path / "older.csv"
+    newest = tmp_path / "newest.csv"
+    write(older, "NASDAQ:AAPL")
+    write(newest, "NASDAQ:AAPL,NASDAQ:META")
+
+    now = time.time()
+    os.utime(older, (now - 300, now - 300))
+    os.utime(newest, (now - 100, now - 100))
+
+    for pattern in ("*.csv", "./*.csv"):
+        run_main(str(tmp_path), "--pattern", pattern, "--no-print", "--keep-latest")
+        out_file = tmp_path / "newest_filtered.txt"
+        assert out_file.read_text(encoding="utf-8") == "NASDAQ:META"
+        out_file.unlink()
+
+def test_seen_cache_is_refreshed_when_older_file_changes(tmp_path: Path, run_main):
+    """
+    The first run caches the parsed older file. After the older file is
+    edited, the next run must re-parse it instead of using stale symbols.
+    """
+    older = tmp_path / "older.csv"
+    newest = tmp_path / "newest.csv"
+
+    write(older, "NASDAQ:AAPL")
+    write(newest, "NASDAQ:AAPL,NASDAQ:MSFT")
+
+    now = time.time()
+    os.utime(older, (now - 300, now - 300))
+    os.utime(newest, (now - 100, now - 100))
+
+    args = [str(tmp_path), "--keep-latest", "--no-print"]
+    run_main(*args)
+    assert (tmp_path / ".watchlist_cache.json").exists(), "Cache file not created."
+    out_file = tmp_path / "newest_filtered.txt"
+    assert out_file.read_text(encoding="utf-8") == "NASDAQ:MSFT"
+
+    # Edit the older file (new size and mtime), keep it older than newest
+    out_file.unlink()
+    write(older, "NASDAQ:AAPL,NASDAQ:MSFT")
+    os.utime(older, (now - 250, now - 250))
+
+    run_main(*args)
+    assert out_file.read_text(encoding="utf-8") == ""
+
+def test_seen_cache_drops_entries_for_deleted_files(tmp_path: Path, run_main):
+    """
+    Cache entries for files that no longer exist are pruned on the next run,
+    so the cache does not grow forever as sources are deleted.
+    """
+    older1 = tmp_path / "older1.csv"
+    older2 = tmp_path / "older2.csv"
+    newest = tmp_path / "newest.csv"
+    write(older1, "NASDAQ:AAPL")
+    write(older2, "NASDAQ:MSFT")
+    write(newest, "NASDAQ:AAPL,NASDAQ:META")
+
+    now = time.time()
+    os.utime(older1, (now - 300, now - 300))
+    os.utime(older2, (now - 200, now - 200))
+    os.utime(newest, (now - 100, now - 100))
+
+    args = [str(tmp_path), "--keep-latest", "--no-print"]
+    cache_file = tmp_path / ".watchlist_cache.json"
+    run_main(*args)
+    assert set(json.loads(cache_file.read_text(encoding="utf-8"))["files"]) == {"older1.csv", "older2.csv"}
+
+    older2.unlink()
+    (tmp_path / "newest_filtered.txt").unlink()
+    run_main(*args)
+    assert set(json.loads(cache_file.read_text(encoding="utf-8"))["files"]) == {"older1.csv"}
+
+def test_seen_cache_from_another_version_is_ignored(tmp_path: Path, run_main):
+    """
+    A cache written with a different format/parser version is discarded,
+    even when its (mtime, size) stamps still match the files.
+    """
+    older = tmp_path / "older.csv"
+    newest = tmp_path / "newest.csv"
+    write(older, "NASDAQ:AAPL")
+    write(newest, "NASDAQ:AAPL,NASDAQ:META")
+
+    now = time.time()
+    os.utime(older, (now - 300, now - 300))
+    os.utime(newest, (now - 100, now - 100))
+
+    st = older.stat()
+    stale = {"version": -1, "files": {"older.csv": [st.st_mtime_ns, st.st_size, "NASDAQ:META"]}}
+    (tmp_path / ".watchlist_cache.json").write_text(json.dumps(stale), encoding="utf-8")
+
+    run_main(str(tmp_path), "--no-print")
+    assert (tmp_path / "newest_filtered.txt").read_text(encoding="utf-8") == "NASDAQ:META"
@@ -0,0 +1,49 @@
+# tests/test_parsing.py
+import random
+import re
+from pathlib import Path
+
+def reference_split(text: str) -> list[str]:
+    """The original v1.4 split_symbols, kept as the behavioural reference."""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    out = []
+    for p in re.split(r"[,\n\r]+", text):
+        s = p.strip()
+        if not s or s.startswith("###") or s.startswith("//") or s.startswith("#"):
+            continue
+        out.append(s)
+    return out
+
+def test_comment_lines_are_skipped(flw):
+    text = "### Header\nNASDAQ:AAPL\n# note\n// other note\nNASDAQ:MSFT,#inline,NASDAQ:NVDA"
+    assert flw.split_symbols(text) == ["NASDAQ:AAPL", "NASDAQ:MSFT", "NASDAQ:NVDA"]
+
+def test_block_comments_spanning_separators_are_removed(flw):
+    text = "NASDAQ:AAPL,/* skip,\nNASDAQ:TSLA\n */NASDAQ:META,NAS/*x*/DAQ:AMZN"
+    assert flw.split_symbols(text) == ["NASDAQ:AAPL", "NASDAQ:META", "NASDAQ:AMZN"]
+
+def test_unterminated_block_comment_is_kept_literally(flw):
+    assert flw.split_symbols("NASDAQ:AAPL,/* open\nNASDAQ:MSFT") == ["NASDAQ:AAPL", "/* open", "NASDAQ:MSFT"]
+
+def test_whitespace_nbsp_and_crlf_are_trimmed(flw):
+    text = "  NASDAQ:AAPL\u00a0\r\n\tNASDAQ:MSFT \r\n\u3000NASDAQ:NVDA\r\n"
+    assert flw.split_symbols(text) == ["NASDAQ:AAPL", "NASDAQ:MSFT", "NASDAQ:NVDA"]
+
+def test_invalid_utf8_is_dropped_when_reading(flw, tmp_path: Path):
+    # Undecodable bytes are ignored: b"/\xff/" reads as a '//' comment, b"A\xffB" as "AB".
+    f = tmp_path / "bad.csv"
+    f.write_bytes(b"/\xff/ note\nA\xffB")
+    assert flw.read_symbols_from_file(f) == ["AB"]
+
+def test_empty_file_yields_nothing(flw, tmp_path: Path):
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+    assert flw.read_symbols_from_file(empty) == []
+
+def test_matches_reference_parser_on_random_input(flw):
+    """Seeded comparison against the original parser."""
+    rng = random.Random(1234)
+    alphabet = ["A", "B", ",", "\n", "\r", " ", "\t", "/", "*", "#", "\u00e9", "\u00a0", "\x1c"]
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 25)))
+        assert flw.split_symbols(text) == reference_split(text), repr(text)